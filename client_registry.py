@@ -8,14 +8,85 @@ Provides automatic registration and manual management capabilities
 import json
 import os
 import asyncio
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import atexit
+import functools
+import mmap
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Any, Set
+from dataclasses import dataclass, fields
 import logging
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional for the CLI
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Mutations inside this window are coalesced into a single registry write
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+# Upper bound on changed clients held back by the debounce window
+SAVE_MAX_BATCH = 256
+
+# Exports are streamed through a large buffer instead of being built in memory
+EXPORT_BUFFER_SIZE = 1 << 20
+
+# The log is folded into a fresh snapshot once it holds this many records per client
+COMPACT_LOG_RATIO = 2
+
+def _dumps(data: Any) -> bytes:
+    """Serialize data to indented UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _dumps_compact(data: Any) -> bytes:
+    """Serialize data to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def _dumps_line(data: Any) -> bytes:
+    """Serialize data to a single compact JSON line"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8') + b"\n"
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+def _read_json(file_path: str) -> Any:
+    """Parse a JSON file straight from a read-only memory map"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return _loads(view)
+
+def _to_iso(timestamp: float) -> str:
+    """Format epoch seconds as a naive UTC ISO string, empty for never"""
+    if not timestamp:
+        return ""
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
+def _from_iso(value: str) -> float:
+    """Parse a naive UTC ISO string into epoch seconds, 0 for never"""
+    if not value:
+        return 0.0
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+@dataclass(slots=True)
 class ClientInfo:
     """Information about a connected client"""
     client_id: str
@@ -25,8 +96,8 @@ class ClientInfo:
     capabilities: List[str] = None
     location: Optional[Dict[str, float]] = None
     status: str = "offline"  # "online", "offline", "maintenance"
-    first_connected: str = ""
-    last_connected: str = ""
+    first_connected: float = 0.0  # epoch seconds, 0 means never
+    last_connected: float = 0.0
     total_connections: int = 0
     is_authorized: bool = True
     metadata: Dict[str, Any] = None
@@ -36,6 +107,37 @@ class ClientInfo:
             self.capabilities = []
         if self.metadata is None:
             self.metadata = {}
+        # Stored files keep ISO strings; convert them on the way in
+        if isinstance(self.first_connected, str):
+            self.first_connected = _from_iso(self.first_connected)
+        if isinstance(self.last_connected, str):
+            self.last_connected = _from_iso(self.last_connected)
+
+    @property
+    def first_connected_iso(self) -> str:
+        return _to_iso(self.first_connected)
+
+    @property
+    def last_connected_iso(self) -> str:
+        return _to_iso(self.last_connected)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ClientInfo":
+        """Build a ClientInfo from stored data, ignoring unknown keys"""
+        if data.keys() <= _FIELD_SET:
+            return cls(**data)
+        return cls(**{key: value for key, value in data.items() if key in _FIELD_SET})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of all fields, cheaper than dataclasses.asdict"""
+        data = {name: getattr(self, name) for name in _FIELDS}
+        data["first_connected"] = self.first_connected_iso
+        data["last_connected"] = self.last_connected_iso
+        return data
+
+# Field names in declaration order, computed once
+_FIELDS = tuple(f.name for f in fields(ClientInfo))
+_FIELD_SET = frozenset(_FIELDS)
 
 class ClientRegistry:
     """Manages registration and tracking of drones and applications"""
@@ -45,64 +147,260 @@ class ClientRegistry:
         self.clients: Dict[str, ClientInfo] = {}
         self.online_clients: Dict[str, ClientInfo] = {}
         
+        # Secondary indexes kept in sync with every mutation
+        self._by_type: Dict[str, Dict[str, ClientInfo]] = {}
+        self._online_by_type: Dict[str, Dict[str, ClientInfo]] = {}
+        self._unauthorized_ids: Set[str] = set()
+        
+        # Serialized form of each client, refreshed only for changed clients
+        self._serialized: Dict[str, Dict[str, Any]] = {}
+        
+        # Append-only change log applied on top of the snapshot file
+        self.log_file = f"{registry_file}.log"
+        self._log_records = 0
+        
+        # Pending write state for debounced saves
+        self._dirty_ids: Set[str] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Disk writes run here, one at a time, so the event loop never blocks on I/O
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="registry-io")
+        self._log_failed = False
+        
         # Load existing registry
         self.load_registry()
         
+        # Make sure pending changes reach disk on interpreter shutdown
+        atexit.register(self.flush)
+        
     def load_registry(self):
         """Load client registry from file"""
         try:
             if os.path.exists(self.registry_file):
-                with open(self.registry_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = _read_json(self.registry_file)
                     
                 for client_id, client_data in data.items():
-                    self.clients[client_id] = ClientInfo(**client_data)
+                    self.clients[client_id] = ClientInfo.from_dict(client_data)
                     
                 logger.info(f"Loaded {len(self.clients)} clients from registry")
             else:
                 logger.info("No existing registry file found, starting fresh")
+            
+            corrupt_log = self._replay_log()
                 
         except Exception as e:
             logger.error(f"Error loading client registry: {e}")
             self.clients = {}
+            corrupt_log = False
+        
+        self._rebuild_indexes()
+        self._serialized = {client_id: client_info.to_dict() for client_id, client_info in self.clients.items()}
+        
+        # Start a clean log so new entries are not appended to a torn line
+        if corrupt_log:
+            self.save_registry()
+    
+    def _rebuild_indexes(self):
+        """Recompute the secondary indexes from scratch"""
+        self._by_type = {}
+        self._online_by_type = {}
+        self._unauthorized_ids = set()
+        for client_id, client_info in self.clients.items():
+            self._index_client(client_id, client_info)
+    
+    def _index_client(self, client_id: str, client_info: ClientInfo):
+        """Add a client to the secondary indexes"""
+        self._by_type.setdefault(client_info.client_type, {})[client_id] = client_info
+        if client_id in self.online_clients:
+            self._online_by_type.setdefault(client_info.client_type, {})[client_id] = client_info
+        if not client_info.is_authorized:
+            self._unauthorized_ids.add(client_id)
+    
+    def _unindex_client(self, client_id: str, client_info: ClientInfo):
+        """Remove a client from the secondary indexes"""
+        self._by_type.get(client_info.client_type, {}).pop(client_id, None)
+        self._online_by_type.get(client_info.client_type, {}).pop(client_id, None)
+        self._unauthorized_ids.discard(client_id)
+    
+    def _replay_log(self) -> bool:
+        """Apply journaled changes written since the last snapshot, return True if the log is damaged"""
+        if not os.path.exists(self.log_file):
+            return False
+        
+        corrupt = False
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    # A torn write can leave a partial last line behind
+                    logger.warning(f"Skipping corrupt registry log entry in {self.log_file}")
+                    corrupt = True
+                    continue
+                
+                if record["op"] == "upsert":
+                    self.clients[record["id"]] = ClientInfo.from_dict(record["fields"])
+                elif record["op"] == "delete":
+                    self.clients.pop(record["id"], None)
+                self._log_records += 1
+        
+        if self._log_records:
+            logger.info(f"Replayed {self._log_records} registry log entries")
+        
+        return corrupt
     
     def save_registry(self):
-        """Save client registry to file"""
+        """Save a full snapshot of the client registry and reset the log"""
+        lines = None if self._log_failed else []
+        self._log_records = 0
+        self._log_failed = False
+        self._run_write(functools.partial(self._write_snapshot, dict(self._serialized), lines))
+    
+    def _write_snapshot(self, registry_data: Dict[str, Dict[str, Any]], lines: Optional[List[bytes]]):
+        """Write a registry snapshot to disk (runs on the I/O thread)"""
         try:
-            # Convert ClientInfo objects to dictionaries
-            registry_data = {}
-            for client_id, client_info in self.clients.items():
-                registry_data[client_id] = asdict(client_info)
+            # Write the new snapshot next to the old one and make it durable
+            tmp_file = f"{self.registry_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps(registry_data))
+                f.flush()
+                os.fsync(f.fileno())
             
-            # Write to file with backup
+            # Keep the previous snapshot as a backup (hard link, no copy)
             backup_file = f"{self.registry_file}.backup"
             if os.path.exists(self.registry_file):
-                if os.path.exists(backup_file):
-                    os.remove(backup_file)
-                os.rename(self.registry_file, backup_file)
+                try:
+                    if os.path.exists(backup_file):
+                        os.remove(backup_file)
+                    os.link(self.registry_file, backup_file)
+                except OSError as e:
+                    logger.warning(f"Could not update registry backup: {e}")
+            
+            # Append the compacted batch first so that, if we crash before the log is removed,
+            # replaying it over the new snapshot is harmless. A log that missed an earlier
+            # batch (lines is None) cannot be brought up to date and is dropped instead.
+            if lines is not None:
+                try:
+                    with open(self.log_file, 'ab') as f:
+                        f.write(b"".join(lines))
+                        f.flush()
+                        os.fsync(f.fileno())
+                except OSError as e:
+                    logger.warning(f"Could not append to registry log before compaction: {e}")
+                    lines = None
+            if lines is None and os.path.exists(self.log_file):
+                os.remove(self.log_file)
             
-            with open(self.registry_file, 'w', encoding='utf-8') as f:
-                json.dump(registry_data, f, indent=2, ensure_ascii=False)
+            # Atomically swap in the new snapshot
+            os.replace(tmp_file, self.registry_file)
+            
+            # Everything in the log is now part of the snapshot
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
                 
-            logger.info(f"Saved {len(self.clients)} clients to registry")
+            logger.info(f"Saved {len(registry_data)} clients to registry")
             
         except Exception as e:
             logger.error(f"Error saving client registry: {e}")
     
+    def _write_log(self, lines: List[bytes]):
+        """Append encoded records to the log (runs on the I/O thread)"""
+        try:
+            with open(self.log_file, 'ab') as f:
+                f.write(b"".join(lines))
+        except Exception as e:
+            logger.error(f"Error writing client registry log: {e}")
+            # Fall back to a full snapshot on the next flush
+            self._log_failed = True
+    
+    def _run_write(self, write: Callable[[], None]):
+        """Run a disk write on the I/O thread and wait for it"""
+        try:
+            self._io_executor.submit(write).result()
+        except RuntimeError:
+            # Executor is gone at interpreter exit; nothing else is writing
+            write()
+    
+    def _collect_writes(self) -> Optional[Callable[[], None]]:
+        """Refresh the cache for changed clients and build the pending disk write"""
+        if not self._dirty_ids and not self._log_failed:
+            return None
+        
+        dirty_ids, self._dirty_ids = self._dirty_ids, set()
+        
+        # Refresh the serialized form of changed clients only
+        lines = []
+        for client_id in dirty_ids:
+            client_info = self.clients.get(client_id)
+            if client_info is not None:
+                client_data = self._serialized[client_id] = client_info.to_dict()
+                record = {"op": "upsert", "id": client_id, "fields": client_data}
+            else:
+                self._serialized.pop(client_id, None)
+                record = {"op": "delete", "id": client_id}
+            lines.append(_dumps_line(record))
+        self._log_records += len(lines)
+        
+        # Compact once the log outgrows the snapshot it applies to
+        if self._log_failed or self._log_records > COMPACT_LOG_RATIO * max(len(self.clients), 1):
+            compact_lines = None if self._log_failed else lines
+            self._log_records = 0
+            self._log_failed = False
+            return functools.partial(self._write_snapshot, dict(self._serialized), compact_lines)
+        
+        return functools.partial(self._write_log, lines)
+    
+    def _mark_dirty(self, *client_ids: str):
+        """Schedule a debounced save of changed clients"""
+        self._dirty_ids.update(client_ids)
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (CLI usage) - persist immediately
+            self.flush()
+            return
+        
+        # Flush right away once a batch is full so bursts stay bounded
+        delay = 0 if len(self._dirty_ids) >= SAVE_MAX_BATCH else SAVE_DEBOUNCE_SECONDS
+        if self._flush_handle is not None:
+            if self._flush_handle.when() <= loop.time() + delay:
+                return
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, self._flush_in_background)
+    
+    def _flush_in_background(self):
+        """Hand pending changes to the I/O thread without blocking the event loop"""
+        self._flush_handle = None
+        write = self._collect_writes()
+        if write is not None:
+            asyncio.get_running_loop().run_in_executor(self._io_executor, write)
+    
+    def flush(self):
+        """Write pending registry changes to disk and wait for completion"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        write = self._collect_writes()
+        if write is not None:
+            self._run_write(write)
+    
     def register_client(self, client_id: str, client_type: str, **kwargs) -> ClientInfo:
         """Register a new client or update existing one"""
-        current_time = datetime.utcnow().isoformat()
+        current_time = time.time()
         
         if client_id in self.clients:
             # Update existing client
             client_info = self.clients[client_id]
+            self._unindex_client(client_id, client_info)
             client_info.last_connected = current_time
             client_info.total_connections += 1
             client_info.status = "online"
             
             # Update any provided fields
             for key, value in kwargs.items():
-                if hasattr(client_info, key):
+                if key in _FIELD_SET:
                     setattr(client_info, key, value)
                     
             logger.info(f"Updated existing {client_type} client: {client_id}")
@@ -134,22 +432,28 @@ class ClientRegistry:
         
         # Add to online clients
         self.online_clients[client_id] = client_info
+        self._index_client(client_id, client_info)
         
-        # Save registry
-        self.save_registry()
+        # Schedule registry save
+        self._mark_dirty(client_id)
         
         return client_info
     
     def unregister_client(self, client_id: str):
         """Mark client as offline"""
-        if client_id in self.clients:
-            self.clients[client_id].status = "offline"
-            self.clients[client_id].last_connected = datetime.utcnow().isoformat()
+        client_info = self.clients.get(client_id)
+        if client_info is not None:
+            self._unindex_client(client_id, client_info)
             
         if client_id in self.online_clients:
             del self.online_clients[client_id]
             
-        self.save_registry()
+        if client_info is not None:
+            client_info.status = "offline"
+            client_info.last_connected = time.time()
+            self._index_client(client_id, client_info)
+            self._mark_dirty(client_id)
+            
         logger.info(f"Client marked as offline: {client_id}")
     
     def get_client(self, client_id: str) -> Optional[ClientInfo]:
@@ -158,15 +462,15 @@ class ClientRegistry:
     
     def get_clients_by_type(self, client_type: str) -> List[ClientInfo]:
         """Get all clients of a specific type"""
-        return [client for client in self.clients.values() if client.client_type == client_type]
+        return list(self._by_type.get(client_type, {}).values())
     
-    def get_online_clients(self) -> Dict[str, ClientInfo]:
-        """Get all currently online clients"""
-        return self.online_clients.copy()
+    def get_online_clients(self) -> Mapping[str, ClientInfo]:
+        """Get a read-only view of all currently online clients"""
+        return MappingProxyType(self.online_clients)
     
     def get_online_clients_by_type(self, client_type: str) -> List[ClientInfo]:
         """Get online clients of a specific type"""
-        return [client for client in self.online_clients.values() if client.client_type == client_type]
+        return list(self._online_by_type.get(client_type, {}).values())
     
     def update_client(self, client_id: str, **updates) -> bool:
         """Update client information"""
@@ -174,52 +478,52 @@ class ClientRegistry:
             return False
         
         client_info = self.clients[client_id]
+        self._unindex_client(client_id, client_info)
         for key, value in updates.items():
-            if hasattr(client_info, key):
+            if key in _FIELD_SET:
                 setattr(client_info, key, value)
+        self._index_client(client_id, client_info)
         
-        self.save_registry()
+        self._mark_dirty(client_id)
         return True
     
     def authorize_client(self, client_id: str, authorized: bool = True):
         """Authorize or deauthorize a client"""
-        if client_id in self.clients:
-            self.clients[client_id].is_authorized = authorized
-            self.save_registry()
+        client_info = self.clients.get(client_id)
+        if client_info is not None:
+            if client_info.is_authorized != authorized:
+                self._unindex_client(client_id, client_info)
+                client_info.is_authorized = authorized
+                self._index_client(client_id, client_info)
+            self._mark_dirty(client_id)
             logger.info(f"Client {client_id} {'authorized' if authorized else 'deauthorized'}")
     
     def remove_client(self, client_id: str) -> bool:
         """Completely remove a client from registry"""
         removed = False
         if client_id in self.clients:
-            del self.clients[client_id]
+            self._unindex_client(client_id, self.clients.pop(client_id))
             removed = True
         
         if client_id in self.online_clients:
             del self.online_clients[client_id]
         
         if removed:
-            self.save_registry()
+            self._mark_dirty(client_id)
             logger.info(f"Client removed from registry: {client_id}")
         
         return removed
     
     def get_stats(self) -> Dict[str, Any]:
         """Get registry statistics"""
-        drones = self.get_clients_by_type("drone")
-        applications = self.get_clients_by_type("application")
-        
-        online_drones = self.get_online_clients_by_type("drone")
-        online_applications = self.get_online_clients_by_type("application")
-        
         return {
             "total_clients": len(self.clients),
-            "total_drones": len(drones),
-            "total_applications": len(applications),
+            "total_drones": len(self._by_type.get("drone", {})),
+            "total_applications": len(self._by_type.get("application", {})),
             "online_clients": len(self.online_clients),
-            "online_drones": len(online_drones),
-            "online_applications": len(online_applications),
-            "authorized_clients": len([c for c in self.clients.values() if c.is_authorized]),
+            "online_drones": len(self._online_by_type.get("drone", {})),
+            "online_applications": len(self._online_by_type.get("application", {})),
+            "authorized_clients": len(self.clients) - len(self._unauthorized_ids),
             "registry_file": self.registry_file,
             "last_updated": datetime.utcnow().isoformat()
         }
@@ -230,17 +534,18 @@ class ClientRegistry:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             file_path = f"clients_export_{timestamp}.json"
         
-        export_data = {
-            "export_timestamp": datetime.utcnow().isoformat(),
-            "stats": self.get_stats(),
-            "clients": {}
-        }
-        
-        for client_id, client_info in self.clients.items():
-            export_data["clients"][client_id] = asdict(client_info)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        # Stream one client per line so memory stays flat for large registries
+        with open(file_path, 'wb', buffering=EXPORT_BUFFER_SIZE) as f:
+            f.write(b'{\n  "export_timestamp": ' + _dumps_compact(datetime.utcnow().isoformat()))
+            f.write(b',\n  "stats": ' + _dumps_compact(self.get_stats()))
+            f.write(b',\n  "clients": {')
+            
+            separator = b"\n    "
+            for client_id, client_info in self.clients.items():
+                f.write(separator + _dumps_compact(client_id) + b": " + _dumps_compact(client_info.to_dict()))
+                separator = b",\n    "
+            
+            f.write(b"\n  }\n}\n")
         
         logger.info(f"Exported {len(self.clients)} clients to {file_path}")
         return file_path
@@ -248,17 +553,19 @@ class ClientRegistry:
     def import_clients(self, file_path: str) -> int:
         """Import clients from a JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_json(file_path)
             
             imported_count = 0
             clients_data = data.get("clients", {})
             
             for client_id, client_data in clients_data.items():
-                self.clients[client_id] = ClientInfo(**client_data)
+                if client_id in self.clients:
+                    self._unindex_client(client_id, self.clients[client_id])
+                self.clients[client_id] = ClientInfo.from_dict(client_data)
+                self._index_client(client_id, self.clients[client_id])
                 imported_count += 1
             
-            self.save_registry()
+            self._mark_dirty(*clients_data)
             logger.info(f"Imported {imported_count} clients from {file_path}")
             return imported_count
             
@@ -288,5 +595,5 @@ def get_registry_stats() -> Dict[str, Any]:
 
 def is_client_authorized(client_id: str) -> bool:
     """Check if a client is authorized"""
-    client_info = client_registry.get_client(client_id)
-    return client_info.is_authorized if client_info else True  # Allow new clients by default
+    # Unknown clients are allowed by default, so only denied ids are tracked
+    return client_id not in client_registry._unauthorized_ids
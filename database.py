@@ -117,31 +117,43 @@ class DatabaseManager:
             logger.error(f"Error during database disconnect: {e}")
             self.is_connected = False
     
+    def prepare_alert(self, alert_data: Dict[str, Any]) -> str:
+        """Fill in alert defaults and assign its document ID before insertion"""
+        # Generate a unique alert_id if not provided
+        if 'alert_id' not in alert_data or not alert_data['alert_id']:
+            import uuid
+            alert_data['alert_id'] = f"alert_{uuid.uuid4().hex[:8]}"
+        
+        # Add timestamp if not present
+        if 'timestamp' not in alert_data:
+            alert_data['timestamp'] = datetime.utcnow().isoformat()
+        
+        # Stamp created_at with the server time (a datetime is only present if already prepared)
+        if not isinstance(alert_data.get('created_at'), datetime):
+            alert_data['created_at'] = datetime.utcnow()
+        
+        # Set default values if not present
+        if 'response' not in alert_data:
+            alert_data['response'] = 0
+        if 'image_received' not in alert_data:
+            alert_data['image_received'] = 0
+        if 'status' not in alert_data:
+            alert_data['status'] = 'pending'
+        
+        # Pre-assign the ObjectId so callers know the alert ID before the insert completes
+        if '_id' not in alert_data:
+            from bson import ObjectId
+            alert_data['_id'] = ObjectId()
+        
+        return str(alert_data['_id'])
+    
     async def create_alert(self, alert_data: Dict[str, Any]) -> str:
         """Create a new alert"""
         try:
             if not self.is_connected:
                 raise Exception("Database not connected")
             
-            # Generate a unique alert_id if not provided
-            if 'alert_id' not in alert_data or not alert_data['alert_id']:
-                import uuid
-                alert_data['alert_id'] = f"alert_{uuid.uuid4().hex[:8]}"
-            
-            # Add timestamp if not present
-            if 'timestamp' not in alert_data:
-                alert_data['timestamp'] = datetime.utcnow().isoformat()
-            
-            # Add created_at field
-            alert_data['created_at'] = datetime.utcnow()
-            
-            # Set default values if not present
-            if 'response' not in alert_data:
-                alert_data['response'] = 0
-            if 'image_received' not in alert_data:
-                alert_data['image_received'] = 0
-            if 'status' not in alert_data:
-                alert_data['status'] = 'pending'
+            self.prepare_alert(alert_data)
             
             result = await self.alerts_collection.insert_one(alert_data)
             logger.info(f"Created alert with ID: {result.inserted_id}")
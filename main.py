@@ -62,9 +62,8 @@ async def lifespan(app: FastAPI):
                     }
             
             if 'fullDocument' in change_event:
-                # Serialize the full document
-                from websocket_manager import serialize_datetime
-                serialized_change['fullDocument'] = serialize_datetime(change_event['fullDocument'])
+                # Datetimes and ObjectIds are converted by the WebSocket encoder
+                serialized_change['fullDocument'] = change_event['fullDocument']
             
             if 'updateDescription' in change_event:
                 serialized_change['updateDescription'] = change_event['updateDescription']
@@ -93,6 +92,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Drone Alert Management System...")
+    client_registry.flush()
     await db_manager.disconnect()
     logger.info("System shutdown complete")
 
@@ -170,8 +170,7 @@ async def websocket_drone_endpoint(websocket: WebSocket, drone_id: str):
         while True:
             try:
                 # Receive message
-                data = await websocket.receive_text()
-                message_data = json.loads(data)
+                message_data = await websocket_manager.receive_message(client_id, websocket)
                 
                 # Handle the message
                 await websocket_manager.handle_websocket_message(client_id, message_data)
@@ -191,7 +190,7 @@ async def websocket_drone_endpoint(websocket: WebSocket, drone_id: str):
         logger.error(f"Error in drone WebSocket connection: {e}")
     finally:
         if client_id:
-            await websocket_manager.disconnect(client_id)
+            await websocket_manager.disconnect(client_id, websocket)
 
 @app.websocket("/ws/application/{app_id}")
 async def websocket_application_endpoint(websocket: WebSocket, app_id: str):
@@ -210,13 +209,10 @@ async def websocket_application_endpoint(websocket: WebSocket, app_id: str):
         try:
             alerts = await db_manager.get_all_alerts(limit=50)
             if alerts:
-                # Ensure alerts are properly serialized
-                from websocket_manager import serialize_datetime
-                serialized_alerts = serialize_datetime(alerts)
-                
+                # Datetimes and ObjectIds are converted by the WebSocket encoder
                 initial_data_message = {
                     "type": "initial_alerts",
-                    "alerts": serialized_alerts,
+                    "alerts": alerts,
                     "timestamp": datetime.utcnow().isoformat()
                 }
                 await websocket_manager.send_personal_message(client_id, initial_data_message)
@@ -227,8 +223,7 @@ async def websocket_application_endpoint(websocket: WebSocket, app_id: str):
         while True:
             try:
                 # Receive message
-                data = await websocket.receive_text()
-                message_data = json.loads(data)
+                message_data = await websocket_manager.receive_message(client_id, websocket)
                 
                 # Handle the message
                 await websocket_manager.handle_websocket_message(client_id, message_data)
@@ -248,7 +243,7 @@ async def websocket_application_endpoint(websocket: WebSocket, app_id: str):
         logger.error(f"Error in application WebSocket connection: {e}")
     finally:
         if client_id:
-            await websocket_manager.disconnect(client_id)
+            await websocket_manager.disconnect(client_id, websocket)
 
 # REST API endpoints for additional functionality
 
@@ -484,22 +479,7 @@ async def get_results_by_drone(drone_id: str, limit: int = 50):
 async def get_all_clients():
     """Get all registered clients"""
     try:
-        clients = {}
-        for client_id, client_info in client_registry.clients.items():
-            clients[client_id] = {
-                "client_id": client_info.client_id,
-                "client_type": client_info.client_type,
-                "name": client_info.name,
-                "description": client_info.description,
-                "capabilities": client_info.capabilities,
-                "location": client_info.location,
-                "status": client_info.status,
-                "first_connected": client_info.first_connected,
-                "last_connected": client_info.last_connected,
-                "total_connections": client_info.total_connections,
-                "is_authorized": client_info.is_authorized,
-                "metadata": client_info.metadata
-            }
+        clients = {client_id: client_info.to_dict() for client_id, client_info in client_registry.clients.items()}
         return {"clients": clients, "count": len(clients)}
     except Exception as e:
         logger.error(f"Error getting clients: {e}")
@@ -513,20 +493,7 @@ async def get_client_info(client_id: str):
         if not client_info:
             raise HTTPException(status_code=404, detail="Client not found")
         
-        return {
-            "client_id": client_info.client_id,
-            "client_type": client_info.client_type,
-            "name": client_info.name,
-            "description": client_info.description,
-            "capabilities": client_info.capabilities,
-            "location": client_info.location,
-            "status": client_info.status,
-            "first_connected": client_info.first_connected,
-            "last_connected": client_info.last_connected,
-            "total_connections": client_info.total_connections,
-            "is_authorized": client_info.is_authorized,
-            "metadata": client_info.metadata
-        }
+        return client_info.to_dict()
     except HTTPException:
         raise
     except Exception as e:
@@ -541,23 +508,7 @@ async def get_clients_by_type(client_type: str):
             raise HTTPException(status_code=400, detail="Invalid client type. Must be 'drone' or 'application'")
         
         clients = client_registry.get_clients_by_type(client_type)
-        client_data = []
-        
-        for client_info in clients:
-            client_data.append({
-                "client_id": client_info.client_id,
-                "client_type": client_info.client_type,
-                "name": client_info.name,
-                "description": client_info.description,
-                "capabilities": client_info.capabilities,
-                "location": client_info.location,
-                "status": client_info.status,
-                "first_connected": client_info.first_connected,
-                "last_connected": client_info.last_connected,
-                "total_connections": client_info.total_connections,
-                "is_authorized": client_info.is_authorized,
-                "metadata": client_info.metadata
-            })
+        client_data = [client_info.to_dict() for client_info in clients]
         
         return {"clients": client_data, "count": len(client_data), "client_type": client_type}
     except HTTPException:
@@ -571,23 +522,7 @@ async def get_online_clients():
     """Get all currently online clients"""
     try:
         online_clients = client_registry.get_online_clients()
-        client_data = {}
-        
-        for client_id, client_info in online_clients.items():
-            client_data[client_id] = {
-                "client_id": client_info.client_id,
-                "client_type": client_info.client_type,
-                "name": client_info.name,
-                "description": client_info.description,
-                "capabilities": client_info.capabilities,
-                "location": client_info.location,
-                "status": client_info.status,
-                "first_connected": client_info.first_connected,
-                "last_connected": client_info.last_connected,
-                "total_connections": client_info.total_connections,
-                "is_authorized": client_info.is_authorized,
-                "metadata": client_info.metadata
-            }
+        client_data = {client_id: client_info.to_dict() for client_id, client_info in online_clients.items()}
         
         return {"clients": client_data, "count": len(client_data)}
     except Exception as e:
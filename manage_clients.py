@@ -8,62 +8,61 @@ import argparse
 import sys
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any
-from client_registry import ClientRegistry, ClientInfo
+from client_registry import ClientRegistry, ClientInfo, client_registry
+
+@lru_cache(maxsize=32)
+def _table_formats(widths: tuple) -> tuple:
+    """Build (row format, separator) strings for the given column widths"""
+    row_format = " | ".join([f"{{:<{width}}}" for width in widths])
+    separator = "-+-".join(["-" * width for width in widths])
+    return row_format, separator
 
 def format_table(data: list, headers: list) -> str:
     """Format data as a table"""
     if not data:
         return "No data to display"
     
+    # Convert every cell to text once
+    str_rows = [[str(cell) for cell in row] for row in data]
+    
     # Calculate column widths
-    widths = [len(header) for header in headers]
-    for row in data:
-        for i, cell in enumerate(row):
-            widths[i] = max(widths[i], len(str(cell)))
+    widths = tuple(max(map(len, column)) for column in zip(headers, *str_rows))
     
-    # Create format string
-    row_format = " | ".join([f"{{:<{width}}}" for width in widths])
-    separator = "-+-".join(["-" * width for width in widths])
+    # Reuse format strings for tables with the same layout
+    row_format, separator = _table_formats(widths)
     
     # Build table
-    result = []
-    result.append(row_format.format(*headers))
-    result.append(separator)
+    lines = [row_format.format(*headers), separator]
+    lines.extend(row_format.format(*row) for row in str_rows)
     
-    for row in data:
-        result.append(row_format.format(*[str(cell) for cell in row]))
-    
-    return "\n".join(result)
+    return "\n".join(lines)
 
 def list_clients(registry: ClientRegistry, client_type: str = None, status: str = None):
     """List all clients or filter by type/status"""
-    clients = registry.clients
-    
-    if client_type:
-        clients = {k: v for k, v in clients.items() if v.client_type == client_type}
+    # Start from the per-type index when filtering by type
+    clients = registry.get_clients_by_type(client_type) if client_type else registry.clients.values()
     
-    if status:
-        clients = {k: v for k, v in clients.items() if v.status == status}
-    
-    if not clients:
-        print("No clients found matching criteria")
-        return
-    
-    # Prepare data for table
+    # Prepare data for table in a single pass
     headers = ["Client ID", "Type", "Name", "Status", "Connections", "Last Connected", "Authorized"]
-    rows = []
-    
-    for client in clients.values():
-        rows.append([
+    rows = [
+        [
             client.client_id,
             client.client_type.title(),
             client.name or "N/A",
             client.status.title(),
             client.total_connections,
-            client.last_connected[:19] if client.last_connected else "Never",
+            client.last_connected_iso[:19] if client.last_connected else "Never",
             "✓" if client.is_authorized else "✗"
-        ])
+        ]
+        for client in clients
+        if not status or client.status == status
+    ]
+    
+    if not rows:
+        print("No clients found matching criteria")
+        return
     
     print(format_table(rows, headers))
 
@@ -81,8 +80,8 @@ def show_client_details(registry: ClientRegistry, client_id: str):
     print(f"Description: {client.description or 'N/A'}")
     print(f"Status: {client.status.title()}")
     print(f"Authorized: {'Yes' if client.is_authorized else 'No'}")
-    print(f"First Connected: {client.first_connected[:19] if client.first_connected else 'Never'}")
-    print(f"Last Connected: {client.last_connected[:19] if client.last_connected else 'Never'}")
+    print(f"First Connected: {client.first_connected_iso[:19] if client.first_connected else 'Never'}")
+    print(f"Last Connected: {client.last_connected_iso[:19] if client.last_connected else 'Never'}")
     print(f"Total Connections: {client.total_connections}")
     
     if client.capabilities:
@@ -216,8 +215,8 @@ def main():
         parser.print_help()
         return
     
-    # Initialize registry
-    registry = ClientRegistry()
+    # Reuse the registry loaded at import instead of parsing the file twice
+    registry = client_registry
     
     try:
         if args.command == 'list':
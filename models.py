@@ -1,6 +1,5 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any, Tuple
-from datetime import datetime
 from enum import Enum
 
 class AlertStatus(str, Enum):
@@ -91,9 +90,4 @@ class WebSocketMessage(BaseModel):
 class DroneCommand(BaseModel):
     alert_id: str
     command: str
-    parameters: Optional[Dict[str, Any]] = None
-
-class ConnectionInfo(BaseModel):
-    client_id: str
-    client_type: str
-    connected_at: datetime 
\ No newline at end of file
+    parameters: Optional[Dict[str, Any]] = None
\ No newline at end of file
@@ -1,37 +1,116 @@
 import asyncio
+import base64
+import binascii
+import functools
 import json
 import logging
+import orjson
+import time
 from bson import ObjectId
-from typing import Dict, Set, Optional, Any
+from pymongo import ReturnDocument
+from typing import Awaitable, Callable, Dict, Set, Optional, Any, Tuple, Union
 from fastapi import WebSocket, WebSocketDisconnect
+from dataclasses import dataclass
 from datetime import datetime
 import uuid
-from models import WebSocketMessage, ConnectionInfo, DroneCommand
+import zlib
+from models import WebSocketMessage, DroneCommand
 from database import db_manager
 from client_registry import client_registry, is_client_authorized
 
-def serialize_datetime(obj):
-    """Recursively serialize datetime, ObjectId, and other MongoDB objects in dictionaries"""
-    if isinstance(obj, dict):
-        return {key: serialize_datetime(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [serialize_datetime(item) for item in obj]
-    elif isinstance(obj, datetime):
+try:
+    import msgpack
+except ImportError:  # msgpack framing is only offered when the package is installed
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Image fields carried as raw bin (instead of base64) for MessagePack clients
+_IMAGE_FIELDS = ('actual_image', 'matched_frame')
+
+# zlib clients get payloads above this size deflated (b'Z' prefix), smaller ones as plain JSON (b'J')
+ZLIB_MIN_SIZE = 1024
+
+# Pre-encoded pong frame for JSON clients; only the timestamp changes
+_PONG_TEMPLATE = '{"type":"pong","timestamp":"%s"}'
+
+# Seconds an alert handler waits for its database insert after broadcasting
+ALERT_INSERT_TIMEOUT = 2.0
+
+# Frames buffered per client before it is considered too slow and dropped
+SEND_QUEUE_SIZE = 256
+
+# JSON frames already waiting in a batching client's queue are folded into one batch frame
+BATCH_MAX_MESSAGES = 64
+_BATCH_PREFIX = '{"type":"batch","messages":['
+
+def _default(obj):
+    """Encoder fallback for datetime, bytes and MongoDB types"""
+    if isinstance(obj, datetime):
         return obj.isoformat()
-    elif hasattr(obj, '__class__') and obj.__class__.__name__ == 'ObjectId':
-        return str(obj)
-    elif hasattr(obj, '__class__') and obj.__class__.__name__ == 'Timestamp':
-        # Handle MongoDB Timestamp objects
-        return str(obj)
-    elif hasattr(obj, '__class__') and obj.__class__.__name__ == 'BSON':
-        # Handle other BSON types
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode()
+    if obj.__class__.__name__ in ('ObjectId', 'Timestamp', 'BSON'):
         return str(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    """Encode an outgoing message as JSON (datetimes become ISO strings)"""
+    return orjson.dumps(message, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def _with_binary_images(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an alert_image message with its base64 image fields decoded to raw bytes"""
+    data = message.get("data")
+    if not isinstance(data, dict) or not any(isinstance(data.get(field), str) for field in _IMAGE_FIELDS):
+        return message
+    
+    data = dict(data)
+    for field in _IMAGE_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            try:
+                data[field] = base64.b64decode(value, validate=True)
+            except binascii.Error:
+                pass  # not plain base64 (e.g. a data URL); send it unchanged
+    return {**message, "data": data}
+
+def _encode_frame(message: Dict[str, Any], encoding: str) -> Union[str, bytes]:
+    """Encode a message for a connection: text JSON, binary MessagePack or prefixed zlib JSON"""
+    if encoding == "msgpack":
+        # MessagePack carries bytes natively, so image blobs skip the base64 inflation
+        if message.get("type") == "alert_image":
+            message = _with_binary_images(message)
+        return msgpack.packb(message, default=_default, use_bin_type=True)
+    if encoding == "zlib":
+        raw = _encode(message)
+        if len(raw) > ZLIB_MIN_SIZE:
+            return b'Z' + zlib.compress(raw, 1)
+        return b'J' + raw
+    return _encode(message).decode()
+
+async def _send_frame(websocket: WebSocket, frame: Union[str, bytes]):
+    """Send an encoded frame using the matching WebSocket frame type"""
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
     else:
-        return obj
+        await websocket.send_text(frame)
 
-logger = logging.getLogger(__name__)
+@dataclass(slots=True)
+class ConnectionInfo:
+    """Per-connection metadata kept for the lifetime of a socket"""
+    client_id: str
+    client_type: str
+    connected_at: float  # epoch seconds
+    encoding: str = "json"  # "json" (text frames), "msgpack" or "zlib" (binary frames)
+    batch: bool = False  # fold queued JSON messages into {"type": "batch"} frames
 
 class WebSocketManager:
+    __slots__ = (
+        'drone_connections', 'application_connections', 'connection_info', '_client_type',
+        'drone_alerts', 'send_queues', 'writer_tasks', '_apps_snapshot', '_drones_snapshot',
+        '_dispatch', '_message_types',
+    )
+    
     def __init__(self):
         # Store active connections by client type
         self.drone_connections: Dict[str, WebSocket] = {}
@@ -39,13 +118,48 @@ class WebSocketManager:
         
         # Store connection metadata
         self.connection_info: Dict[str, ConnectionInfo] = {}
+        self._client_type: Dict[str, str] = {}  # client_id -> client_type, read per inbound message
         
         # Store drone-to-alert mapping for command routing
         self.drone_alerts: Dict[str, str] = {}  # drone_id -> alert_id
         
+        # Outgoing frames per client, drained by one writer task per connection
+        self.send_queues: Dict[str, asyncio.Queue] = {}
+        self.writer_tasks: Dict[str, asyncio.Task] = {}
+        
+        # Frozen (client_id, queue, encoding) fanout lists, rebuilt on connect/disconnect
+        self._apps_snapshot: Tuple[Tuple[str, asyncio.Queue, str], ...] = ()
+        self._drones_snapshot: Tuple[Tuple[str, asyncio.Queue, str], ...] = ()
+        
+        # Inbound message handlers keyed by (message type, sender client type)
+        self._dispatch: Dict[Tuple[str, str], Callable[[str, Dict[str, Any]], Awaitable[None]]] = {
+            ('alert', 'drone'): self.handle_alert_from_drone,
+            ('alert_image', 'drone'): self.handle_alert_image_from_drone,
+            ('alert_image', 'application'): self.handle_alert_image_from_application,
+            ('drone_pos', 'drone'): self.send_drone_pos_to_applications,
+            ('target_pos', 'application'): self.send_taget_pos_to_drone,
+            ('validated_alert', 'drone'): self.send_validated_alert_to_applications,
+            ('ping', 'drone'): self._handle_ping,
+            ('ping', 'application'): self._handle_ping,
+        }
+        self._message_types: Set[str] = {message_type for message_type, _ in self._dispatch}
+        
     async def connect(self, websocket: WebSocket, client_type: str, client_id: Optional[str] = None):
         """Accept a new WebSocket connection"""
-        await websocket.accept()
+        # Clients that offer the msgpack or zlib subprotocol get binary frames
+        encoding = "json"
+        subprotocols = websocket.scope.get("subprotocols", [])
+        if msgpack is not None and "msgpack" in subprotocols:
+            encoding = "msgpack"
+            await websocket.accept(subprotocol="msgpack")
+        elif "zlib" in subprotocols:
+            encoding = "zlib"
+            await websocket.accept(subprotocol="zlib")
+        else:
+            await websocket.accept()
+        
+        # JSON clients can opt in to batched frames with ?batch=1
+        batch = encoding == "json" and websocket.query_params.get("batch") == "1"
         
         # Generate client ID if not provided
         if not client_id:
@@ -61,6 +175,9 @@ class WebSocketManager:
         client_info = client_registry.register_client(client_id, client_type)
         logger.info(f"Client registered/updated in registry: {client_id} ({client_info.name})")
         
+        # A reconnect replaces any socket still held for this client_id
+        await self._replace_connection(client_id)
+        
         # Store connection based on client type
         if client_type == "drone":
             self.drone_connections[client_id] = websocket
@@ -74,8 +191,17 @@ class WebSocketManager:
         self.connection_info[client_id] = ConnectionInfo(
             client_id=client_id,
             client_type=client_type,
-            connected_at=datetime.utcnow()
+            connected_at=time.time(),
+            encoding=encoding,
+            batch=batch
         )
+        self._client_type[client_id] = client_type
+        
+        # Start the writer that owns all sends on this socket
+        queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.send_queues[client_id] = queue
+        self.writer_tasks[client_id] = asyncio.create_task(self._writer(client_id, websocket, queue, batch))
+        self._refresh_snapshots()
         
         logger.info(f"New {client_type} connection: {client_id}")
         
@@ -93,8 +219,34 @@ class WebSocketManager:
         
         return client_id
     
-    async def disconnect(self, client_id: str):
+    async def _replace_connection(self, client_id: str):
+        """Stop the writer and close the socket of a connection superseded by a reconnect"""
+        previous = self.drone_connections.pop(client_id, None) or self.application_connections.pop(client_id, None)
+        self.send_queues.pop(client_id, None)
+        writer_task = self.writer_tasks.pop(client_id, None)
+        if writer_task is not None:
+            writer_task.cancel()
+        
+        if previous is None:
+            return
+        
+        self._refresh_snapshots()
+        logger.info(f"Replacing existing connection for {client_id}")
+        try:
+            await previous.close(code=1000, reason="Replaced by new connection")
+        except Exception as e:
+            logger.error(f"Error closing replaced connection for {client_id}: {e}")
+    
+    def _current_socket(self, client_id: str) -> Optional[WebSocket]:
+        """Socket currently registered for a client, if any"""
+        return self.drone_connections.get(client_id) or self.application_connections.get(client_id)
+    
+    async def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
         """Handle WebSocket disconnection"""
+        # A socket replaced by a reconnect no longer owns this client_id
+        if websocket is not None and websocket is not self._current_socket(client_id):
+            return
+        
         try:
             # Update client registry status
             client_registry.unregister_client(client_id)
@@ -110,27 +262,86 @@ class WebSocketManager:
             # Remove connection info
             if client_id in self.connection_info:
                 del self.connection_info[client_id]
+            self._client_type.pop(client_id, None)
             
             # Remove drone-alert mapping if applicable
             if client_id in self.drone_alerts:
                 del self.drone_alerts[client_id]
+            
+            # Stop the writer (unless it is the one disconnecting us)
+            self.send_queues.pop(client_id, None)
+            writer_task = self.writer_tasks.pop(client_id, None)
+            if writer_task is not None and writer_task is not asyncio.current_task():
+                writer_task.cancel()
+            
+            self._refresh_snapshots()
                 
         except Exception as e:
             logger.error(f"Error during disconnect for {client_id}: {e}")
     
+    async def _writer(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue, batch: bool = False):
+        """Drain a client's send queue onto its socket"""
+        while True:
+            frame = await queue.get()
+            
+            # Coalesce whatever queued up during the previous send into one frame
+            if batch and not queue.empty():
+                frames = [frame]
+                while len(frames) < BATCH_MAX_MESSAGES and not queue.empty():
+                    frames.append(queue.get_nowait())
+                frame = _BATCH_PREFIX + ','.join(frames) + ']}'
+            
+            try:
+                await _send_frame(websocket, frame)
+            except Exception as e:
+                logger.error(f"Error sending to {client_id}: {e}")
+                await self.disconnect(client_id, websocket)
+                return
+    
+    def _refresh_snapshots(self):
+        """Rebuild the broadcast fanout lists after the connection set changed"""
+        self._apps_snapshot = tuple(
+            (client_id, self.send_queues[client_id], self._encoding(client_id))
+            for client_id in self.application_connections if client_id in self.send_queues
+        )
+        self._drones_snapshot = tuple(
+            (client_id, self.send_queues[client_id], self._encoding(client_id))
+            for client_id in self.drone_connections if client_id in self.send_queues
+        )
+    
+    def _enqueue(self, client_id: str, frame: Union[str, bytes]) -> bool:
+        """Queue a frame for a client, returning False if its queue is full"""
+        queue = self.send_queues.get(client_id)
+        if queue is None:
+            return True
+        return self._put_frame(client_id, queue, frame)
+    
+    @staticmethod
+    def _put_frame(client_id: str, queue: asyncio.Queue, frame: Union[str, bytes]) -> bool:
+        """Put a frame on a send queue without waiting, returning False if it is full"""
+        try:
+            queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Send queue full for {client_id}, dropping slow client")
+            return False
+    
+    async def _drop_slow_client(self, client_id: str):
+        """Disconnect a client that cannot keep up with its send queue"""
+        websocket = self._current_socket(client_id)
+        await self.disconnect(client_id)
+        if websocket is not None:
+            try:
+                await websocket.close(code=1008, reason="Client too slow")
+            except Exception as e:
+                logger.error(f"Error closing slow client {client_id}: {e}")
+    
     async def send_personal_message(self, client_id: str, message: Dict[str, Any]):
         """Send message to a specific client"""
         try:
-            websocket = None
-            if client_id in self.drone_connections:
-                websocket = self.drone_connections[client_id]
-            elif client_id in self.application_connections:
-                websocket = self.application_connections[client_id]
-            
-            if websocket:
-                # Serialize datetime objects before sending
-                serialized_message = serialize_datetime(message)
-                await websocket.send_text(json.dumps(serialized_message))
+            if client_id in self.send_queues:
+                if not self._enqueue(client_id, _encode_frame(message, self._encoding(client_id))):
+                    await self._drop_slow_client(client_id)
             else:
                 logger.warning(f"Client {client_id} not found for personal message")
                 
@@ -140,50 +351,87 @@ class WebSocketManager:
     
     async def broadcast_to_applications(self, message: Dict[str, Any]):
         """Broadcast message to all connected applications"""
-        if not self.application_connections:
+        if not self._apps_snapshot:
             return
         
-        disconnected_clients = []
-        
-        for client_id, websocket in self.application_connections.items():
-            try:
-                # Serialize datetime objects before sending
-                serialized_message = serialize_datetime(message)
-                await websocket.send_text(json.dumps(serialized_message))
-            except Exception as e:
-                logger.error(f"Error broadcasting to application {client_id}: {e}")
-                disconnected_clients.append(client_id)
-        
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            await self.disconnect(client_id)
+        await self._broadcast_message(self._apps_snapshot, message)
     
     async def broadcast_to_drones(self, message: Dict[str, Any]):
         """Broadcast message to all connected drones"""
-        if not self.drone_connections:
+        if not self._drones_snapshot:
             return
         
-        disconnected_clients = []
+        await self._broadcast_message(self._drones_snapshot, message)
+    
+    async def _send_pong(self, client_id: str):
+        """Answer a ping, skipping the encoder for JSON clients"""
+        timestamp = datetime.utcnow().isoformat()
+        encoding = self._encoding(client_id)
+        if encoding == "json":
+            frame = _PONG_TEMPLATE % timestamp
+        else:
+            frame = _encode_frame({"type": "pong", "timestamp": timestamp}, encoding)
         
-        for client_id, websocket in self.drone_connections.items():
-            try:
-                # Serialize datetime objects before sending
-                serialized_message = serialize_datetime(message)
-                await websocket.send_text(json.dumps(serialized_message))
-            except Exception as e:
-                logger.error(f"Error broadcasting to drone {client_id}: {e}")
-                disconnected_clients.append(client_id)
+        if not self._enqueue(client_id, frame):
+            await self._drop_slow_client(client_id)
+    
+    async def _handle_ping(self, client_id: str, ping_data: Dict[str, Any]):
+        """Respond to a ping"""
+        await self._send_pong(client_id)
+    
+    def _encoding(self, client_id: str) -> str:
+        """Wire encoding negotiated for a client"""
+        connection_info = self.connection_info.get(client_id)
+        return connection_info.encoding if connection_info else "json"
+    
+    async def _broadcast_message(self, targets: Tuple[Tuple[str, asyncio.Queue, str], ...],
+                                 message: Dict[str, Any], exclude: Optional[str] = None):
+        """Queue a message for every target, encoding it once per wire format"""
+        frames: Dict[str, Union[str, bytes]] = {}
+        slow_clients = []
         
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            await self.disconnect(client_id)
+        for client_id, queue, encoding in targets:
+            if client_id == exclude:
+                continue
+            frame = frames.get(encoding)
+            if frame is None:
+                frame = frames[encoding] = _encode_frame(message, encoding)
+            if not self._put_frame(client_id, queue, frame):
+                slow_clients.append(client_id)
+        
+        # Clean up clients that fell too far behind, closing their sockets concurrently
+        if slow_clients:
+            await asyncio.gather(*(self._drop_slow_client(client_id) for client_id in slow_clients),
+                                 return_exceptions=True)
+    
+    async def receive_message(self, client_id: str, websocket: WebSocket) -> Dict[str, Any]:
+        """Receive and decode the next message using the client's wire encoding"""
+        if self._encoding(client_id) == "msgpack":
+            message = msgpack.unpackb(await websocket.receive_bytes(), raw=False)
+            # Images may come back as raw bin; store them as base64 like JSON clients send them
+            data = message.get("data") if isinstance(message, dict) else None
+            if isinstance(data, dict):
+                for field in _IMAGE_FIELDS:
+                    if isinstance(data.get(field), bytes):
+                        data[field] = base64.b64encode(data[field]).decode()
+            return message
+        text = await websocket.receive_text()
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which Python's json module emits by default
+            return json.loads(text)
     
     async def send_to_drone(self, drone_id: str, message: Dict[str, Any]):
         """Send message to a specific drone"""
-        if drone_id in self.drone_connections:
-            await self.send_personal_message(drone_id, message)
-        else:
+        if drone_id not in self.drone_connections:
             logger.warning(f"Drone {drone_id} not connected")
+            return
+        
+        # Drones in drone_connections always have a send queue (both are set and cleared together)
+        frame = _encode_frame(message, self._encoding(drone_id))
+        if not self._put_frame(drone_id, self.send_queues[drone_id], frame):
+            await self._drop_slow_client(drone_id)
     
     async def handle_alert_from_drone(self, drone_id: str, alert_data: Dict[str, Any]):
         """Handle new alert from drone"""
@@ -194,8 +442,9 @@ class WebSocketManager:
                 'status': 'pending',
             })
             
-            # Insert alert into database
-            alert_id = await db_manager.insert_alert(alert_data)
+            # Assign the alert ID up front and insert concurrently with the broadcast
+            alert_id = db_manager.prepare_alert(alert_data)
+            insert_task = asyncio.create_task(db_manager.insert_alert(alert_data))
             
             # Store drone-alert mapping
             self.drone_alerts[drone_id] = alert_id
@@ -203,12 +452,23 @@ class WebSocketManager:
             # Broadcast the alert with original schema, just add alert_id once outside
             broadcast_message = {
                 "type": "alert",
-                "alert_id": str(alert_id),
-                "data": serialize_datetime(alert_data.copy()),
+                "alert_id": alert_id,
+                "data": alert_data,
                 "timestamp": datetime.utcnow().isoformat()
             }
             await self.broadcast_to_applications(broadcast_message)
             
+            # Wait a bounded time for the insert; a slow write keeps running in the background
+            try:
+                await asyncio.wait_for(asyncio.shield(insert_task), timeout=ALERT_INSERT_TIMEOUT)
+            except asyncio.TimeoutError:
+                insert_task.add_done_callback(functools.partial(self._on_late_insert, drone_id, alert_id))
+                logger.warning(f"Alert {alert_id} from drone {drone_id} broadcasted, database insert still pending")
+                return
+            except Exception as e:
+                await self._retract_alert(drone_id, alert_id, e)
+                return
+            
             logger.info(f"Alert {alert_id} from drone {drone_id} stored and broadcasted")
             
         except Exception as e:
@@ -216,6 +476,24 @@ class WebSocketManager:
             logger.error(f"Alert data: {alert_data}")
     
 
+    async def _retract_alert(self, drone_id: str, alert_id: str, error: BaseException):
+        """Withdraw a broadcasted alert whose database insert failed"""
+        logger.error(f"Alert {alert_id} from drone {drone_id} could not be stored, retracting: {error}")
+        if self.drone_alerts.get(drone_id) == alert_id:
+            del self.drone_alerts[drone_id]
+        
+        await self.broadcast_to_applications({
+            "type": "alert_retracted",
+            "alert_id": alert_id,
+            "reason": "storage_failed",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    
+    def _on_late_insert(self, drone_id: str, alert_id: str, task: asyncio.Task):
+        """Retract an alert whose insert failed after its handler stopped waiting"""
+        if not task.cancelled() and task.exception() is not None:
+            asyncio.ensure_future(self._retract_alert(drone_id, alert_id, task.exception()))
+    
     async def handle_alert_image_from_drone(self, drone_id: str, alert_image_data: Dict[str, Any]):
         """Handle alert image data from drone"""
         try:
@@ -224,22 +502,27 @@ class WebSocketManager:
             # Check if entry with same 'name' exists in database
             name = alert_image_data.get('name')
             if name:
-                # Search for existing entry with same name
-                existing_entries = await db_manager.alert_images_collection.find({'name': name}).to_list(length=None)
+                # Update the entry with the same name or create it, in a single round trip.
+                # _id and created_at only apply on insert (payloads echoed from apps carry both).
+                new_id = ObjectId()
+                created_at = datetime.utcnow()
+                set_fields = {k: v for k, v in alert_image_data.items() if k not in ('_id', 'created_at')}
+                document = await db_manager.alert_images_collection.find_one_and_update(
+                    {'name': name},
+                    {'$set': set_fields, '$setOnInsert': {'_id': new_id, 'created_at': created_at}},
+                    projection={'_id': 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                alert_image_id = str(document['_id'])
                 
-                if existing_entries:
-                    # Update existing entry
-                    existing_id = existing_entries[0]['_id']
-                    await db_manager.alert_images_collection.update_one(
-                        {'_id': existing_id},
-                        {'$set': alert_image_data}
-                    )
-                    alert_image_id = str(existing_id)
-                    logger.info(f"Updated existing alert image with name '{name}' (ID: {alert_image_id})")
-                else:
-                    # Create new entry
-                    alert_image_id = await db_manager.create_alert_image(alert_image_data)
+                if document['_id'] == new_id:
+                    # New entry: broadcast its _id and created_at, as an insert does
+                    alert_image_data['_id'] = new_id
+                    alert_image_data['created_at'] = created_at
                     logger.info(f"Created new alert image with name '{name}' (ID: {alert_image_id})")
+                else:
+                    logger.info(f"Updated existing alert image with name '{name}' (ID: {alert_image_id})")
             else:
                 # No name provided, just create new entry
                 alert_image_id = await db_manager.create_alert_image(alert_image_data)
@@ -248,17 +531,15 @@ class WebSocketManager:
             # Broadcast to ALL clients (both applications and drones) with original schema
             broadcast_message = {
                 "type": "alert_image",
-                "data": serialize_datetime(alert_image_data.copy()),
+                "data": alert_image_data,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
-            # Broadcast to applications
-            await self.broadcast_to_applications(broadcast_message)
-            
-            # Broadcast to all drones (except sender)
-            for other_drone_id in list(self.drone_connections.keys()):
-                if other_drone_id != drone_id:  # Don't send back to sender   #THINK LATER
-                    await self.send_personal_message(other_drone_id, broadcast_message)
+            # Broadcast to applications and all drones (except sender) in one pass,
+            # so each wire format is encoded once for both pools
+            await self._broadcast_message(
+                self._apps_snapshot + self._drones_snapshot, broadcast_message, exclude=drone_id
+            )
             
             logger.info(f"Alert image from drone {drone_id} processed and broadcasted to all clients")
             
@@ -275,7 +556,7 @@ class WebSocketManager:
             # Broadcast to ALL DRONES with original schema - no modifications
             broadcast_message = {
                 "type": "alert_image",
-                "data": serialize_datetime(alert_image_data.copy()),
+                "data": alert_image_data,
                 "timestamp": datetime.utcnow().isoformat()
             }
             await self.broadcast_to_drones(broadcast_message)
@@ -292,7 +573,7 @@ class WebSocketManager:
             message = {
                 "type": "drone_pos",
                 "drone_id": drone_id,
-                "data": serialize_datetime(pos_data.copy()),
+                "data": pos_data,
                 "timestamp": datetime.utcnow().isoformat()
             }
             await self.broadcast_to_applications(message)
@@ -351,7 +632,7 @@ class WebSocketManager:
             # Send target position command to the drone
             message = {
                 "type": "target_pos",
-                "data": serialize_datetime(target_data.copy()),
+                "data": target_data,
                 "timestamp": datetime.utcnow().isoformat()
             }
             await self.send_personal_message(drone_id, message)
@@ -416,7 +697,7 @@ class WebSocketManager:
             
             message = {
                 "type": "validated_alert",
-                "data": serialize_datetime(validated_data.copy()),
+                "data": validated_data,
                 "timestamp": datetime.utcnow().isoformat()
             }
             await self.broadcast_to_applications(message)
@@ -430,63 +711,27 @@ class WebSocketManager:
         """Handle incoming WebSocket message"""
         try:
             message_type = message_data.get('type')
-            connection_info = self.connection_info.get(client_id)
-            client_type = connection_info.client_type if connection_info else None
+            client_type = self._client_type.get(client_id)
             
             if not client_type:
                 logger.error(f"No client type found for {client_id}")
                 return
             
             logger.info(f"Handling message from {client_id} (type: {client_type}): {message_type}")
-            logger.info(f"Message data: {json.dumps(message_data, indent=2)}")
-            
-            if message_type == 'alert':
-                if client_type == 'drone':
-                    logger.info(f"Processing alert from drone {client_id}")
-                    await self.handle_alert_from_drone(client_id, message_data.get('data', {}))
-                else:
-                    logger.warning(f"Applications cannot send alerts")
-            
-            elif message_type == 'alert_image':
-                if client_type == 'drone':
-                    await self.handle_alert_image_from_drone(client_id, message_data.get('data', {}))
-                elif client_type == 'application':
-                    await self.handle_alert_image_from_application(client_id, message_data.get('data', {}))
-                else:
-                    logger.warning(f"Invalid client type for alert_image message")
-
-            elif message_type == 'drone_pos':
-                if client_type == 'drone':
-                    await self.send_drone_pos_to_applications(client_id, message_data.get('data', {}))
-                else:
-                    logger.warning(f"Applications cannot send drone_pos messages")
-            
-            elif message_type == 'target_pos':
-                if client_type == 'application':
-                    await self.send_taget_pos_to_drone(client_id, message_data.get('data', {}))
-                else:
-                    logger.warning(f"Drones cannot send target_pos messages")
-            
-            elif message_type == 'validated_alert':
-                if client_type == 'drone':
-                    await self.send_validated_alert_to_applications(client_id, message_data.get('data', {}))
-                else:
-                    logger.warning(f"Applications cannot send validated_alert messages")
-            
-            elif message_type == 'ping':
-                # Respond to ping
-                pong_message = {
-                    "type": "pong",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                await self.send_personal_message(client_id, pong_message)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Message data: %s", message_data)
             
+            handler = self._dispatch.get((message_type, client_type))
+            if handler is not None:
+                await handler(client_id, message_data.get('data', {}))
+            elif message_type in self._message_types:
+                logger.warning(f"{client_type} clients cannot send {message_type} messages")
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 
         except Exception as e:
             logger.error(f"Error handling WebSocket message from {client_id}: {e}")
-            logger.error(f"Message data: {message_data}")
+            logger.error("Message data: %s", message_data)
     
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get current connection statistics"""